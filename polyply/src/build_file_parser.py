@@ -17,12 +17,83 @@ import networkx as nx
 import vermouth
 from vermouth.parser_utils import SectionLineParser
 from vermouth.log_helpers import StyleAdapter, get_logger
+from polyply import jit
 from .generate_templates import map_from_CoG, compute_volume
 
 LOGGER = StyleAdapter(get_logger(__name__))
 
 PersistenceSpecs = namedtuple("persistence", ["model", "lp", "start", "stop", "mol_idxs"])
 
+# status codes returned by `match_resid_range`
+NO_MATCH = 0
+MATCH = 1
+RESNAME_MISMATCH = 2
+RESID_MISSING = 3
+
+def _match_resid_range(resids, resname_ids, start, stop, target):
+    """
+    Classify nodes by their resid and resname with respect to
+    a half-open resid range and a target resname.
+
+    Parameters
+    ----------
+    resids: np.ndarray(N)
+        the resid of each node
+    resname_ids: np.ndarray(N)
+        integer id of the resname of each node
+    start: float
+    stop: float
+        resids in [start, stop) are considered in range
+    target: int
+        id of the target resname
+
+    Returns
+    -------
+    np.ndarray(N)
+        one of the status codes defined above per node
+    """
+    status = np.empty(resids.shape[0], dtype=np.int8)
+    for idx in range(resids.shape[0]):
+        in_range = start <= resids[idx] < stop
+        if in_range and resname_ids[idx] == target:
+            status[idx] = MATCH
+        elif in_range:
+            status[idx] = RESNAME_MISMATCH
+        elif resname_ids[idx] == target and resids[idx] == 0:
+            status[idx] = RESID_MISSING
+        else:
+            status[idx] = NO_MATCH
+    return status
+
+# numba implementation if available
+match_resid_range = jit(_match_resid_range)
+
+def _node_resid_arrays(molecule):
+    """
+    Collect the resids and resnames of all nodes in `molecule`
+    as arrays that can be passed to `match_resid_range`.
+
+    Returns
+    -------
+    list
+        the nodes in the order of the arrays
+    np.ndarray
+        the resids
+    np.ndarray
+        the resname ids
+    dict
+        mapping of resname to resname id
+    """
+    nodes = list(molecule.nodes)
+    resname_to_id = {}
+    resids = np.empty(len(nodes), dtype=np.int64)
+    resname_ids = np.empty(len(nodes), dtype=np.int64)
+    for idx, node in enumerate(nodes):
+        attrs = molecule.nodes[node]
+        resids[idx] = attrs["resid"]
+        resname_ids[idx] = resname_to_id.setdefault(attrs["resname"], len(resname_to_id))
+    return nodes, resids, resname_ids, resname_to_id
+
 class BuildDirector(SectionLineParser):
     """
     Parser for the build file which dictates additional information
@@ -51,7 +122,8 @@ class BuildDirector(SectionLineParser):
         """
         tokens = line.split()
         self.current_molname = tokens[0]
-        self.current_molidxs = np.arange(float(tokens[1]), float(tokens[2]), 1., dtype=int)
+        # indices may be written as floats (e.g. 0.0)
+        self.current_molidxs = range(int(float(tokens[1])), int(float(tokens[2])))
         for idx in self.current_molidxs:
             if idx not in self.topology.mol_idx_by_name[tokens[0]]:
                 LOGGER.warning("parsing build file: could not find molecule with name {name} and index {index}.",
@@ -128,7 +200,7 @@ class BuildDirector(SectionLineParser):
         model = tokens.pop(0)
         persistence_length = float(tokens.pop(0))
         start, stop = list(map(int, tokens))
-        specs = PersistenceSpecs(*[model, persistence_length, start, stop, self.current_molidxs])
+        specs = PersistenceSpecs(model, persistence_length, start, stop, self.current_molidxs)
         self.topology.persistences.append(specs)
 
     @SectionLineParser.section_parser('template')
@@ -151,7 +223,9 @@ class BuildDirector(SectionLineParser):
         """
         tokens = line.split()
         node_name, atype = tokens[0], tokens[1]
-        position = np.array(tokens[2:], dtype=float)
+        # positions are kept as plain tuples while parsing and
+        # converted to an array once the template is complete
+        position = tuple(map(float, tokens[2:]))
         self.current_template.add_node(node_name,
                                        atomname=node_name,
                                        atype=atype,
@@ -198,7 +272,8 @@ class BuildDirector(SectionLineParser):
         - store coordinates as vectors from center of geometry
         """
         if previous_section == ["template", "bonds"]:
-            coords = nx.get_node_attributes(self.current_template, "position")
+            positions = nx.get_node_attributes(self.current_template, "position")
+            coords = dict(zip(positions, np.array(list(positions.values()), dtype=float)))
             # if the volume is not defined yet compute the volume, this still
             # can be overwritten by an explicit volume directive later
             resname = self.current_template.name
@@ -221,16 +296,26 @@ class BuildDirector(SectionLineParser):
         if that molecule is mentioned in the build file by name.
         """
         for mol_idx, molecule in enumerate(self.molecules):
-
-            if (molecule.mol_name, mol_idx) in self.build_options:
-                for option in self.build_options[(molecule.mol_name, mol_idx)]:
-                    self._tag_nodes(molecule, "restraints", option, molecule.mol_name)
-
-            if (molecule.mol_name, mol_idx)  in self.rw_options:
-                self._tag_nodes(molecule, "rw_options",
-                                self.rw_options[(molecule.mol_name, mol_idx)],
-                                molecule.mol_name)
             molecule.templates = self.templates
+            key = (molecule.mol_name, mol_idx)
+
+            # build_options is a defaultdict, so we must not index it
+            # directly or we would insert empty entries
+            build_options = self.build_options.get(key)
+            rw_option = self.rw_options.get(key)
+            if build_options is None and rw_option is None:
+                continue
+
+            # the node arrays are shared between all options of a molecule
+            node_arrays = _node_resid_arrays(molecule)
+            if build_options is not None:
+                for option in build_options:
+                    self._tag_nodes(molecule, "restraints", option, molecule.mol_name,
+                                    node_arrays=node_arrays)
+
+            if rw_option is not None:
+                self._tag_nodes(molecule, "rw_options", rw_option, molecule.mol_name,
+                                node_arrays=node_arrays)
 
         super().finalize(lineno=lineno)
 
@@ -242,26 +327,29 @@ class BuildDirector(SectionLineParser):
                 del self.topology.volumes[resname]
 
     @staticmethod
-    def _tag_nodes(molecule, keyword, option, molname=""):
-        resids = np.arange(option['start'], option['stop'], 1.)
+    def _tag_nodes(molecule, keyword, option, molname="", node_arrays=None):
+        if node_arrays is None:
+            node_arrays = _node_resid_arrays(molecule)
+        nodes, resids, resname_ids, resname_to_id = node_arrays
+
         resname = option["resname"]
-        for node in molecule.nodes:
-            if molecule.nodes[node]["resid"] in resids\
-            and molecule.nodes[node]["resname"] == resname:
-                molecule.nodes[node][keyword] = molecule.nodes[node].get(keyword, []) +\
-                                                [option['parameters']]
+        status = match_resid_range(resids, resname_ids,
+                                   float(option['start']), float(option['stop']),
+                                   resname_to_id.get(resname, -1))
+        for idx in np.flatnonzero(status):
+            attrs = molecule.nodes[nodes[idx]]
+            if status[idx] == MATCH:
+                attrs.setdefault(keyword, []).append(option['parameters'])
             # broadcast warning if we find the resid but it doesn't match the resname
-            elif molecule.nodes[node]["resid"] in resids and not\
-                 molecule.nodes[node]["resname"] == resname:
+            elif status[idx] == RESNAME_MISMATCH:
                  msg = "parsing build file: could not find resid {resid} with resname {resname} in molecule {molname}."
-                 LOGGER.warning(msg, **{"resid": molecule.nodes[node]["resid"], "resname": resname,
+                 LOGGER.warning(msg, **{"resid": attrs["resid"], "resname": resname,
                                           "molname": molname})
 
             # broadcast warning if we find the resname but it doesn't match the resid
-            elif molecule.nodes[node]["resname"] == resname and not\
-                 molecule.nodes[node]["resid"]:
+            elif status[idx] == RESID_MISSING:
                  msg = "parsing build file: could not find residue {resname} with resid {resid} in molecule {molname}."
-                 LOGGER.warning(msg, **{"resid": molecule.nodes[node]["resid"], "resname": resname,
+                 LOGGER.warning(msg, **{"resid": attrs["resid"], "resname": resname,
                                         "molname": molname})
 
     @staticmethod
@@ -271,7 +359,7 @@ class BuildDirector(SectionLineParser):
         geometry_def["start"] = float(tokens[1])
         geometry_def["stop"] = float(tokens[2])
 
-        point = np.array([float(tokens[4]), float(tokens[5]), float(tokens[6])])
+        point = np.array(tokens[4:7], dtype=float)
         parameters = [tokens[3], point]
 
         for param in tokens[7:]:
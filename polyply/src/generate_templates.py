@@ -174,7 +174,7 @@ def compute_volume(block, coords, nonbond_params, treshold=1e-18):
     block:     :class:`vermouth.molecule.Block`
     coords:    dict[abc.hashable]
         dictionary of positions in from node_idx: np.array
-    nonbond_params: dict[frozenset(abc.hashable, abc.hashable)]
+    nonbond_params: dict[tuple(abc.hashable, abc.hashable)]
         dictionary of nonbonded parameters with atom-types as
         keys and sigma, epsilon LJ parameters
     treshold: float
@@ -194,7 +194,7 @@ def compute_volume(block, coords, nonbond_params, treshold=1e-18):
     radii = []
     for node, coord in coords.items():
         atom_key = block.nodes[node]["atype"]
-        rad = float(nonbond_params[frozenset([atom_key, atom_key])]["nb1"])
+        rad = float(nonbond_params[(atom_key, atom_key)]["nb1"])
         diff = coord - res_center_of_geometry
         if np.linalg.norm(diff) > treshold:
             geom_vects[idx, :] = diff + u_vect(diff) * rad
@@ -119,6 +119,28 @@ def center_of_geometry(points):
     COG = np.average(points, axis=0)
     return COG
 
+def centers_of_geometry(points, offsets):
+    """
+    Compute the center of geometry for consecutive
+    groups of points in one go.
+
+    Parameters
+    ---------
+    points:  numpy.array(N, 3)
+    offsets: numpy.array(M+1)
+        start index of each group in points; the last
+        entry is the end of the last group. Groups
+        must not be empty.
+
+    Returns
+    ---------
+    numpy.array(M, 3)
+    """
+    # reduceat sums up to the end of the array for the last
+    # group, so points past the last group are cut off first
+    sums = np.add.reduceat(points[:offsets[-1]], offsets[:-1], axis=0)
+    return sums / np.diff(offsets)[:, np.newaxis]
+
 def norm_sphere(values=50):
     """
     Generate unit vectors on a
@@ -97,16 +97,14 @@ def set_restraints(topology, nonbond_matrix):
         the nonbond matrix which stores all the pairwise interaction
         parameters and positions
     """
-    for mol_name, mol_idx in topology.distance_restraints:
-        distance_restraints = topology.distance_restraints[(mol_name, mol_idx)]
+    for (mol_name, mol_idx), distance_restraints in topology.distance_restraints.items():
         mol = topology.molecules[mol_idx]
 
-        for ref_node, target_node in distance_restraints:
+        for (ref_node, target_node), (distance, tolerance) in distance_restraints.items():
             path = list(mol.search_tree.edges)
             avg_step_length, _ = compute_avg_step_length(mol,
                                                          mol_idx,
                                                          nonbond_matrix,
                                                          path)
 
-            distance, tolerance = distance_restraints[(ref_node, target_node)]
             set_distance_restraint(mol, target_node, ref_node, distance, avg_step_length, tolerance)
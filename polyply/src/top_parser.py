@@ -17,9 +17,31 @@ from itertools import zip_longest
 from vermouth.parser_utils import SectionLineParser
 from vermouth.molecule import Interaction
 from vermouth.gmx.itp_read import read_itp
+from vermouth.log_helpers import StyleAdapter, get_logger
 from .meta_molecule import MetaMolecule, _make_edges
 from tqdm import tqdm
 
+LOGGER = StyleAdapter(get_logger(__name__))
+
+def _pair_key(atom_type_A, atom_type_B):
+    """
+    Return the key under which the nonbonded parameters
+    of a pair of atom-types are stored. The key is the
+    sorted tuple of the two atom-types.
+    """
+    if atom_type_A <= atom_type_B:
+        return (atom_type_A, atom_type_B)
+    return (atom_type_B, atom_type_A)
+
+def _type_key(atoms):
+    """
+    Return the key under which a bonded type defined for
+    `atoms` is stored. Bonded types match in forward and
+    reverse direction, so they are stored in the orientation
+    that sorts first.
+    """
+    return min(atoms, atoms[::-1])
+
 class TOPDirector(SectionLineParser):
 
     COMMENT_CHAR = ';'
@@ -340,9 +362,9 @@ class TOPDirector(SectionLineParser):
         Parse and store nonbond params
         """
         atom_1, atom_2, func, nb1, nb2 = line.split()
-        self.topology.nonbond_params[frozenset([atom_1, atom_2])] = {"f": int(func),
-                                                                     "nb1": float(nb1),
-                                                                     "nb2": float(nb2)}
+        self.topology.nonbond_params[_pair_key(atom_1, atom_2)] = {"f": int(func),
+                                                                   "nb1": float(nb1),
+                                                                   "nb2": float(nb2)}
     @SectionLineParser.section_parser('pairtypes')
     @SectionLineParser.section_parser('angletypes')
     @SectionLineParser.section_parser('dihedraltypes')
@@ -356,8 +378,26 @@ class TOPDirector(SectionLineParser):
         inter_type = section_name[:-5] + "s"
         atoms, params = self._split_atoms_and_parameters(line.split(),
                                                          self.atom_idxs[section_name])
-
-        self.topology.types[inter_type][tuple(atoms)].append((params, self.current_meta))
+        atoms = tuple(atoms)
+        type_key = _type_key(atoms)
+        type_params = self.topology.types[inter_type][type_key]
+        # Repeats in the same orientation accumulate (e.g. multi-term dihedrals).
+        # A type given in reverse orientation is the same type, so like grompp
+        # the later definition overrides the earlier one. Alternatives within
+        # #ifdef/#else are separate definitions and are tracked independently.
+        meta_key = (self.current_meta["tag"], self.current_meta["condition"])\
+                   if self.current_meta else None
+        orientations = self.topology._type_orientations
+        orientation = orientations.setdefault((inter_type, type_key, meta_key), atoms)
+        if orientation != atoms:
+            msg = ("{} type {} is redefined in reverse orientation as {}. "
+                   "The later definition overrides the earlier one.")
+            LOGGER.warning(msg, inter_type, " ".join(orientation), " ".join(atoms))
+            type_params[:] = [(old_params, meta) for old_params, meta in type_params
+                              if meta != self.current_meta]
+            orientations[(inter_type, type_key, meta_key)] = atoms
+
+        type_params.append((params, self.current_meta))
 
 
     @SectionLineParser.section_parser('implicit_genborn_params')
@@ -467,9 +507,7 @@ class TOPDirector(SectionLineParser):
             raise IOError(msg.format(filename))
 
         with open(filename, 'r') as _file:
-            lines = _file.readlines()
-
-        read_topology(lines, topology=self.topology, cwdir=cwdir)
+            read_topology(_file, topology=self.topology, cwdir=cwdir)
 
     def _split_atoms_and_parameters(self, tokens, atom_idxs):
         """
@@ -518,8 +556,9 @@ def read_topology(lines, topology, cwdir=None):
 
     Parameters
     ----------
-    lines: list
-        list of lines of an itp file
+    lines: abc.iterable
+        lines of an itp file; an open file can be passed
+        to stream it rather than reading it into memory
     force_field: :class:`vermouth.forcefield.ForceField`
     """
     director = TOPDirector(topology, cwdir)
@@ -18,7 +18,7 @@ Provides a class used to describe a gromacs topology and all assciated data.
 import os
 from pathlib import Path
 from collections import defaultdict
-from itertools import combinations
+from itertools import chain
 import numpy as np
 import networkx as nx
 from vermouth.system import System
@@ -26,8 +26,8 @@ from vermouth.forcefield import ForceField
 from vermouth.gmx.gro import read_gro
 from vermouth.pdb import read_pdb
 from vermouth.molecule import Interaction
-from .top_parser import read_topology
-from .linalg_functions import center_of_geometry
+from .top_parser import read_topology, _type_key
+from .linalg_functions import centers_of_geometry
 
 COORD_PARSERS = {"pdb": read_pdb,
                  "gro": read_gro}
@@ -48,7 +48,10 @@ def _coord_parser(path, extension):
         molecule = molecules
 
     box = molecule.box
-    positions = np.array(list(nx.get_node_attributes(molecule, "position").values()))
+    # a single contiguous float array is returned, which is indexed directly
+    # when assigning positions and passed as-is to centers_of_geometry
+    positions = np.array(list(nx.get_node_attributes(molecule, "position").values()),
+                         dtype=np.float64)
     return positions, box
 
 
@@ -69,16 +72,14 @@ def replace_defined_interaction(interaction, defines):
     interaction
       interaction with replaced defines
     """
-    new_parameters = []
-    for parameter in interaction.parameters:
-        if parameter in defines:
-            values = defines[parameter]
-            for new_param in values:
-                new_parameters.append(new_param)
-        else:
-            new_parameters.append(parameter)
+    if not defines or not any(parameter in defines for parameter in interaction.parameters):
+        return interaction
 
-    interaction.parameters[:] = new_parameters[:]
+    # a define can expand to multiple parameters
+    new_parameters = chain.from_iterable(defines[parameter] if parameter in defines
+                                         else (parameter,)
+                                         for parameter in interaction.parameters)
+    interaction.parameters[:] = list(new_parameters)
 
     return interaction
 
@@ -133,22 +134,24 @@ def geometric_rule(C6_A, C6_B, C12_A, C12_B):
     C12 = (C12_A * C12_B)**0.5
     return C6, C12
 
-
-def _wildcard_dih(atoms, idxs):
-    """
-    Given atoms and idxs which define a
-    pattern return a tuple consisting of
-    a entry from atoms if the pattern is
-    an int and else the value in idxs.
-    """
-    atom_key = []
-    for idx in idxs:
-        if type(idx) is int:
-            atom_key.append(atoms[idx])
-        else:
-            atom_key.append(idx)
-
-    return tuple(atom_key)
+# combination rules by the GROMACS comb-rule number
+COMB_FUNCS = {1: lorentz_berthelot_rule,
+              2: geometric_rule,
+              3: lorentz_berthelot_rule}
+
+
+# Wildcard patterns of dihedral types ordered from most to least
+# specific. Each pattern maps the four atom-types of a dihedral
+# to the key of the corresponding dihedral type.
+DIHEDRAL_PATTERNS = (lambda atoms: (atoms[0], atoms[1], atoms[2], atoms[3]),
+                     lambda atoms: ('X', atoms[1], atoms[2], atoms[3]),
+                     lambda atoms: (atoms[0], 'X', atoms[2], atoms[3]),
+                     lambda atoms: (atoms[0], atoms[1], 'X', atoms[3]),
+                     lambda atoms: ('X', atoms[1], atoms[2], 'X'),
+                     lambda atoms: ('X', 'X', atoms[2], atoms[3]),
+                     lambda atoms: (atoms[0], 'X', 'X', atoms[3]),
+                     lambda atoms: ('X', atoms[1], 'X', atoms[3]),
+                     lambda atoms: ('X', 'X', 'X', atoms[3]))
 
 def match_dihedral_interaction_types(atoms, interaction_dict):
     """
@@ -164,7 +167,8 @@ def match_dihedral_interaction_types(atoms, interaction_dict):
     atoms: abc.iteratable
         list of atom-types
     interaction_dict: dict
-        dict of interaction types
+        dict of interaction types with keys in canonical
+        orientation as produced by `_type_key`
 
     Returns
     --------
@@ -172,22 +176,10 @@ def match_dihedral_interaction_types(atoms, interaction_dict):
         a tuple of 4 atom indices, which are the matching key
         to the interaction dict.
     """
-    patterns = [(0, 1, 2, 3),
-                ('X', 1, 2, 3),
-                (0, 'X', 2, 3),
-                (0, 1, 'X', 3),
-                ('X', 1, 2, 'X'),
-                ('X', 'X', 2, 3),
-                (0, 'X', 'X', 3),
-                ('X', 1, 'X', 3),
-                ('X', 'X', 'X', 3)]
-
-    for pattern in patterns:
-        key = _wildcard_dih(atoms, pattern)
+    for pattern in DIHEDRAL_PATTERNS:
+        key = _type_key(pattern(atoms))
         if key in interaction_dict:
             return key
-        elif key[::-1] in interaction_dict:
-            return key[::-1]
 
     return None
 
@@ -210,9 +202,11 @@ class Topology(System):
         The molecules in the system.
     force_field: a :class:`vermouth.forcefield.ForceField`
     nonbond_params: dict
-        A dictionary of all nonbonded parameters
+        A dictionary of all nonbonded parameters keyed by
+        the sorted tuple of the two atom-types
     types: dict
-        A dictionary of all typed parameter
+        A dictionary of all typed parameter; the keys are atom-type
+        tuples in canonical orientation as produced by `_type_key`
     defines: list
         A list of everything that is defined
     volumes: dict
@@ -231,6 +225,7 @@ class Topology(System):
         self.description = []
         self.atom_types = {}
         self.types = defaultdict(lambda: defaultdict(list))
+        self._type_orientations = {}
         self.nonbond_params = {}
         self.mol_idx_by_name = defaultdict(list)
         self.persistences = []
@@ -250,19 +245,23 @@ class Topology(System):
         self.replace_defines()
         self.gen_bonded_interactions()
         # only convert if we not already have sig-eps form
-        if self.defaults['comb-rule'] == 1:
+        if int(self.defaults['comb-rule']) == 1:
             self.convert_nonbond_to_sig_eps()
 
     def replace_defines(self):
         """
         Replace all interaction paramers with defined parameters.
         """
+        # many topologies (e.g. Martini) have no defines at all
+        if not self.defines:
+            return
+
         # Note that a topology cannot define and generate links so
         # they don't need to be replaced or handled elsewhere
         for block in self.force_field.blocks.values():
             for interactions in block.interactions.values():
                 for interaction in interactions:
-                    new_interaction = replace_defined_interaction(interaction, self.defines)
+                    replace_defined_interaction(interaction, self.defines)
 
     def gen_pairs(self):
         """
@@ -273,29 +272,50 @@ class Topology(System):
         Note that nonbond_params takes precedence over atomtypes and
         generated pairs.
         """
-        comb_funcs = {1.0: lorentz_berthelot_rule,
-                      2.0: geometric_rule,
-                      3.0: lorentz_berthelot_rule}
-
-        comb_rule = comb_funcs[self.defaults["comb-rule"]]
+        comb_rule = COMB_FUNCS[int(self.defaults["comb-rule"])]
+        names, nb1, nb2 = self._atom_types_arrays()
 
         if self.defaults["gen-pairs"] == "yes":
-            for atom_type_A, atom_type_B in combinations(self.atom_types, r=2):
-                if frozenset([atom_type_A, atom_type_B]) not in self.nonbond_params:
-                    nb1_A = self.atom_types[atom_type_A]["nb1"]
-                    nb2_A = self.atom_types[atom_type_A]["nb2"]
-                    nb1_B = self.atom_types[atom_type_B]["nb1"]
-                    nb2_B = self.atom_types[atom_type_B]["nb2"]
-                    nb1, nb2 = comb_rule(nb1_A, nb1_B, nb2_A, nb2_B)
-                    self.nonbond_params.update({frozenset([atom_type_A, atom_type_B]):
-                                                {"nb1": nb1, "nb2": nb2}})
-
-        for atom_type in self.atom_types:
-            if frozenset([atom_type, atom_type]) not in self.nonbond_params:
-                nb1 = self.atom_types[atom_type]["nb1"]
-                nb2 = self.atom_types[atom_type]["nb2"]
-                self.nonbond_params.update({frozenset([atom_type, atom_type]):
-                                            {"nb1": nb1, "nb2": nb2}})
+            # the combination rules work on arrays as well, so we
+            # apply them to all unique pairs of atom-types at once
+            idxs_A, idxs_B = np.triu_indices(len(names), k=1)
+            pair_nb1, pair_nb2 = comb_rule(nb1[idxs_A], nb1[idxs_B],
+                                           nb2[idxs_A], nb2[idxs_B])
+            new_pairs = {}
+            # names are sorted and idx_A < idx_B, so the pair is already
+            # in the order used for nonbond_params keys
+            for idx_A, idx_B, nb1_AB, nb2_AB in zip(idxs_A.tolist(), idxs_B.tolist(),
+                                                    pair_nb1.tolist(), pair_nb2.tolist()):
+                pair = (names[idx_A], names[idx_B])
+                if pair not in self.nonbond_params:
+                    new_pairs[pair] = {"nb1": nb1_AB, "nb2": nb2_AB}
+            self.nonbond_params.update(new_pairs)
+
+        for atom_type, nb1_AA, nb2_AA in zip(names, nb1.tolist(), nb2.tolist()):
+            if (atom_type, atom_type) not in self.nonbond_params:
+                self.nonbond_params[(atom_type, atom_type)] = {"nb1": nb1_AA,
+                                                               "nb2": nb2_AA}
+
+    def _atom_types_arrays(self):
+        """
+        Return the sorted atom-type names and their nb1 and
+        nb2 parameters as arrays in the same order.
+
+        Returns
+        -------
+        list
+            the sorted atom-type names
+        np.ndarray
+            the nb1 parameters
+        np.ndarray
+            the nb2 parameters
+        """
+        names = sorted(self.atom_types)
+        nb1 = np.fromiter((self.atom_types[name]["nb1"] for name in names),
+                          dtype=np.float64, count=len(names))
+        nb2 = np.fromiter((self.atom_types[name]["nb2"] for name in names),
+                          dtype=np.float64, count=len(names))
+        return names, nb1, nb2
 
     def gen_bonded_interactions(self):
         """
@@ -314,6 +334,16 @@ class Topology(System):
         OSError
             no match for an interaction in the bonded types provided
         """
+        # whether bond-types are used is the same for the whole topology
+        is_opls = "_FF_OPLS" in self.defines or "_FF_OPLS_AA" in self.defines
+        types = self.types
+        if is_opls:
+            bond_type_by_atype = {atype: params["bond_type"]
+                                  for atype, params in self.atom_types.items()}
+        # the same atom-type quartets reoccur in many dihedrals, so the
+        # result of the wildcard search is stored per quartet
+        dihedral_matches = {}
+
         # We loop over blocks not molecules, because there is only
         # one unique block per molecule, whereas there cab be a large number of
         # duplicate molecules in the topology.molecules list. As the interactions
@@ -323,65 +353,75 @@ class Topology(System):
         # block dict will not propagate into the molecules.
         for mol_name, block in self.force_field.blocks.items():
             additional_interactions = defaultdict(list)
+            # resolve the atom-type of each node only once per block
+            atype_by_node = {node: attrs["atype"] for node, attrs in block.nodes(data=True)
+                             if "atype" in attrs}
             for inter_type, interactions in block.interactions.items():
                 # these interactions have no types associated
                 if inter_type in ["pairs", "exclusions", "virtual_sitesn",
                                   "virtual_sites2", "virtual_sites3", "virtual_sites4"]:
                     continue
 
-                for interaction in interactions:
-                    if len(interaction.parameters) == 1:
-                        # Some force-fields - in GMX library only OPLS - use bond-type
-                        # definitions. Each atomtype matches one bond-type, which
-                        # in turn matches an expression in the bondedtypes section
-                        if "_FF_OPLS" in self.defines or "_FF_OPLS_AA" in self.defines:
-                            atoms = tuple(self.atom_types[block.nodes[node]["atype"]]["bond_type"]
-                                          for node in interaction.atoms)
-                        # Other force-fields like charmm and amber use the atomtype directly for
-                        # matching the bondded types
-                        else:
-                            atoms = tuple(block.nodes[node]["atype"] for node in interaction.atoms)
-
-                        # now we match the atom or bondtypes to the types defined in the topology
-                        if atoms in self.types[inter_type]:
-                            new_params = self.types[inter_type][atoms]
-                        elif atoms[::-1] in self.types[inter_type]:
-                            new_params  = self.types[inter_type][atoms[::-1]]
-                        # dihedrals are more complicated because they are treated as symmetric and
-                        # can have wild-cards
-                        elif inter_type in "dihedrals":
-                            match = match_dihedral_interaction_types(atoms, self.types[inter_type])
-                            if match:
-                                new_params = self.types[inter_type][match]
-                            else:
-                                msg = ("In section dihedrals interaction of atoms {} has no "
-                                       "corresponding bonded type.")
-                                atoms = " ".join(list(map(lambda x: str(x), interaction.atoms)))
-                                raise OSError(msg.format(atoms))
-
+                # types is a defaultdict; get avoids adding empty entries
+                inter_types = types.get(inter_type, {})
+                # only interactions without parameters need to be looked up
+                needs_lookup = (interaction for interaction in interactions
+                                if len(interaction.parameters) == 1)
+                for interaction in needs_lookup:
+                    # Some force-fields - in GMX library only OPLS - use bond-type
+                    # definitions. Each atomtype matches one bond-type, which
+                    # in turn matches an expression in the bondedtypes section
+                    if is_opls:
+                        atoms = tuple(bond_type_by_atype[atype_by_node[node]]
+                                      for node in interaction.atoms)
+                    # Other force-fields like charmm and amber use the atomtype directly for
+                    # matching the bondded types
+                    else:
+                        atoms = tuple(atype_by_node[node] for node in interaction.atoms)
+
+                    # now we match the atom or bondtypes to the types defined in the topology;
+                    # types are stored in canonical orientation so one lookup covers both
+                    type_key = _type_key(atoms)
+                    if type_key in inter_types:
+                        new_params = inter_types[type_key]
+                    # dihedrals are more complicated because they are treated as symmetric and
+                    # can have wild-cards
+                    elif inter_type in "dihedrals":
+                        if atoms not in dihedral_matches:
+                            dihedral_matches[atoms] = match_dihedral_interaction_types(atoms,
+                                                                                       inter_types)
+                        match = dihedral_matches[atoms]
+                        if match:
+                            new_params = inter_types[match]
                         else:
-                            msg = ("In section {} interaction of atoms {} has no corresponding "
-                                   "bonded type.")
+                            msg = ("In section dihedrals interaction of atoms {} has no "
+                                   "corresponding bonded type.")
                             atoms = " ".join(list(map(lambda x: str(x), interaction.atoms)))
-                            raise OSError(msg.format(inter_type, atoms))
-
-                        for idx, (new_param, meta) in enumerate(new_params):
-                            if not meta:
-                                meta = {}
-                            # there is always at least one interaction in molecule, which
-                            # needs to get the typed parameters
-                            if idx == 0:
-                                interaction.parameters[:] = new_param[:]
-                                interaction.meta.update(meta)
-                            # however, sometimes a single interaction term needs to be
-                            # expanded (i.e. a single statment spwans multiple interactions)
-                            # In that case we update the parameters of the first term and
-                            # need to add the other interactions additionally
-                            else:
-                                new_interaction = Interaction(atoms=tuple(interaction.atoms),
-                                                              parameters=new_param,
-                                                              meta=meta)
-                                additional_interactions[inter_type].append(new_interaction)
+                            raise OSError(msg.format(atoms))
+
+                    else:
+                        msg = ("In section {} interaction of atoms {} has no corresponding "
+                               "bonded type.")
+                        atoms = " ".join(list(map(lambda x: str(x), interaction.atoms)))
+                        raise OSError(msg.format(inter_type, atoms))
+
+                    for idx, (new_param, meta) in enumerate(new_params):
+                        if not meta:
+                            meta = {}
+                        # there is always at least one interaction in molecule, which
+                        # needs to get the typed parameters
+                        if idx == 0:
+                            interaction.parameters[:] = new_param
+                            interaction.meta.update(meta)
+                        # however, sometimes a single interaction term needs to be
+                        # expanded (i.e. a single statment spwans multiple interactions)
+                        # In that case we update the parameters of the first term and
+                        # need to add the other interactions additionally
+                        else:
+                            new_interaction = Interaction(atoms=tuple(interaction.atoms),
+                                                          parameters=new_param,
+                                                          meta=meta)
+                            additional_interactions[inter_type].append(new_interaction)
 
 
             # here we add the expanded interactions into the molecules
@@ -395,21 +435,30 @@ class Topology(System):
         LJ potential. Note that this assumes the parameters
         are in A, B form.
         """
-        for atom_pair in self.nonbond_params:
-            nb1 = self.nonbond_params[atom_pair]["nb1"]
-            nb2 = self.nonbond_params[atom_pair]["nb2"]
-
-            if nb2 != 0:
-                sig = (nb2/nb1)**(1.0/6.0)
-            else:
-                sig = 0
-
-            if nb1 != 0:
-                eps = nb1**2.0/(4*nb2)
-            else:
-                eps = 0
-
-            self.nonbond_params.update({atom_pair: {"nb1": sig, "nb2": eps}})
+        atom_pairs = list(self.nonbond_params)
+        nb1 = np.fromiter((self.nonbond_params[pair]["nb1"] for pair in atom_pairs),
+                          dtype=np.float64, count=len(atom_pairs))
+        nb2 = np.fromiter((self.nonbond_params[pair]["nb2"] for pair in atom_pairs),
+                          dtype=np.float64, count=len(atom_pairs))
+
+        # sigma and epsilon are only defined if both parameters are zero
+        # (no interaction) or both are non-zero
+        undefined = (nb1 == 0) != (nb2 == 0)
+        if np.any(undefined):
+            pair = atom_pairs[np.flatnonzero(undefined)[0]]
+            msg = ("Cannot convert nonbonded parameters of atom-types {} to sigma "
+                   "epsilon form, because only one of C6 and C12 is zero.")
+            raise ZeroDivisionError(msg.format(" ".join(map(str, pair))))
+
+        nonzero = nb1 != 0
+        sig = np.zeros_like(nb1)
+        eps = np.zeros_like(nb1)
+        np.divide(nb2, nb1, out=sig, where=nonzero)
+        sig **= 1.0/6.0
+        np.divide(nb1**2.0, 4*nb2, out=eps, where=nonzero)
+
+        self.nonbond_params.update({pair: {"nb1": sig_AB, "nb2": eps_AB} for pair, sig_AB, eps_AB
+                                    in zip(atom_pairs, sig.tolist(), eps.tolist())})
 
     def add_positions_from_file(self, path, skip_res=[], resolution='mol'):
         """
@@ -438,40 +487,46 @@ class Topology(System):
         positions, self.box = _coord_parser(path, extension)
         max_coords = len(positions)
         total = 0
+        # the center of geometry of residues with molecule coordinates
+        # is computed for all of them at once after the loop; skipped
+        # residues consume no coordinates so these residues are
+        # contiguous in positions and one offset per residue suffices
+        cog_nodes = []
+        cog_offsets = [0]
         for meta_mol in self.molecules:
-            for meta_node in meta_mol.nodes:
-                resname = meta_mol.nodes[meta_node]["resname"]
-                # the fragment graph nodes are not sorted so we sort them by index
-                # as defined in the itp-file to capture cases, where the molecule
-                # graph nodes are permuted with respect to the index
-                idx_nodes = nx.get_node_attributes(meta_mol.nodes[meta_node]['graph'], "index")
-                mol_nodes = sorted(idx_nodes, key=idx_nodes.get)
+            molecule_nodes = meta_mol.molecule.nodes
+            for meta_node, node_attrs in meta_mol.nodes(data=True):
+                resname = node_attrs["resname"]
                 # skip residue if resname is to be skipped or
                 # if the no more coordinates are available
                 # in that case we want to build the node and
                 # backmap it
                 if resname in skip_res or total >= max_coords:
-                    meta_mol.nodes[meta_node]["build"] = True
-                    meta_mol.nodes[meta_node]["backmap"] = True
+                    node_attrs["build"] = True
+                    node_attrs["backmap"] = True
                 # here we only add meta_molecule coordiantes
                 # in that case we only want to backmap
                 elif resolution == 'meta_mol':
-                    meta_mol.nodes[meta_node]["position"] = positions[total]
-                    meta_mol.nodes[meta_node]["backmap"] = True
-                    meta_mol.nodes[meta_node]["build"] = False
+                    node_attrs["position"] = positions[total]
+                    node_attrs["backmap"] = True
+                    node_attrs["build"] = False
                     total += 1
                 # here we set molecule coordinates in that case we neither
                 # want to backmap nor build these nodes
                 else:
-                    start = total
+                    # the fragment graph nodes are not sorted so we sort them by index
+                    # as defined in the itp-file to capture cases, where the molecule
+                    # graph nodes are permuted with respect to the index
+                    idx_nodes = nx.get_node_attributes(node_attrs['graph'], "index")
+                    mol_nodes = sorted(idx_nodes, key=idx_nodes.get)
                     for mol_node in mol_nodes:
                         # of the coordinates for a single residue are incomplete
                         # we raise an error because otherwise we would set them
                         # based on a non-complete residue
                         try:
-                            meta_mol.molecule.nodes[mol_node]["position"] = positions[total]
+                            molecule_nodes[mol_node]["position"] = positions[total]
                         except IndexError:
-                            resid = meta_mol.nodes[meta_node]['resid']
+                            resid = node_attrs['resid']
                             mol_name = meta_mol.mol_name
                             msg = (f"Trying to add position to {resname}{resid} of "
                                     "molecule {mol_name}, but missing coordinates. "
@@ -481,9 +536,15 @@ class Topology(System):
                             raise IOError(msg) from IndexError
                         total += 1
 
-                    meta_mol.nodes[meta_node]["position"] = center_of_geometry(positions[start:total])
-                    meta_mol.nodes[meta_node]["build"] = False
-                    meta_mol.nodes[meta_node]["backmap"] = False
+                    cog_nodes.append(node_attrs)
+                    cog_offsets.append(total)
+                    node_attrs["build"] = False
+                    node_attrs["backmap"] = False
+
+        if cog_nodes:
+            centers = centers_of_geometry(positions, np.array(cog_offsets))
+            for node_attrs, center in zip(cog_nodes, centers):
+                node_attrs["position"] = center
 
     def convert_to_vermouth_system(self):
         system = System()
@@ -507,11 +568,9 @@ class Topology(System):
         name:  str
            The name of the system
         """
-        with open(path, 'r') as _file:
-            lines = _file.readlines()
-
         cwdir = os.path.dirname(path)
         force_field = ForceField(name)
         topology = cls(force_field=force_field, name=name)
-        read_topology(lines=lines, topology=topology, cwdir=cwdir)
+        with open(path, 'r') as _file:
+            read_topology(lines=_file, topology=topology, cwdir=cwdir)
         return topology
@@ -93,6 +93,22 @@ def test_tag_nodes(test_molecule, _type, option, expected):
         if "restraints" in test_molecule.nodes[node]:
            assert node in expected
 
+@pytest.mark.parametrize('resids, resname_ids, start, stop, target, expected', (
+   # match within range and resname, resids outside range are not matched
+   ([1, 2, 3, 4], [0, 0, 0, 0], 2, 4, 0, [0, 1, 1, 0]),
+   # resid in range but wrong resname
+   ([1, 2, 3, 4], [0, 1, 0, 1], 1, 5, 1, [2, 1, 2, 1]),
+   # resname matches but resid is not set
+   ([0, 2, 3], [0, 0, 1], 2, 3, 0, [3, 1, 0]),
+   # target resname is not in molecule
+   ([1, 2, 3], [0, 0, 0], 1, 4, -1, [2, 2, 2]),
+   ))
+def test_match_resid_range(resids, resname_ids, start, stop, target, expected):
+    status = polyply.src.build_file_parser.match_resid_range(np.array(resids, dtype=np.int64),
+                                                             np.array(resname_ids, dtype=np.int64),
+                                                             float(start), float(stop), target)
+    assert np.array_equal(status, expected)
+
 @pytest.fixture()
 def test_system():
   """
@@ -121,9 +137,9 @@ def test_system():
   top = Topology(force_field=force_field)
   top.molecules = molecules
   top.mol_idx_by_name = {"AA":[0, 1], "BB": [2], "NA":[3, 4, 5, 6]}
-  top.nonbond_params = {frozenset(["O"]): {"nb1": 0.30},
-                        frozenset(["C"]): {"nb1": 0.36},
-                        frozenset(["H"]): {"nb1": 0.04}}
+  top.nonbond_params = {("O", "O"): {"nb1": 0.30},
+                        ("C", "C"): {"nb1": 0.36},
+                        ("H", "H"): {"nb1": 0.04}}
   return top
 
 @pytest.mark.parametrize('line, expected', (
@@ -201,6 +217,15 @@ def test_distance_restraints_error(test_system, line):
    """,
    [2],
    [2, 3, 4, 5]),
+   # test molecule indices given as floats
+   ("""
+   [ molecule ]
+   AA    0.0  2.0
+   [ cylinder ]
+   ALA   2    4  in  5  5  5  5  5
+   """,
+   [0, 1],
+   [0, 1, 2, 3]),
    # test nothing is tagged based on the molname
    ("""
    [ molecule ]
@@ -303,9 +303,9 @@ class TestGenTemps:
 ])
 def test_compute_volume(lines, coords, volume):
     meta_mol = polyply.MetaMolecule()
-    nonbond_params = {frozenset(["P1", "P1"]): {"nb1": 0.47, "nb2":0.5},
-                      frozenset(["P2", "P2"]): {"nb1": 0.23, "nb2":0.5},
-                      frozenset(["P2", "P1"]): {"nb1": 0.35, "nb2":0.5},}
+    nonbond_params = {("P1", "P1"): {"nb1": 0.47, "nb2":0.5},
+                      ("P2", "P2"): {"nb1": 0.23, "nb2":0.5},
+                      ("P1", "P2"): {"nb1": 0.35, "nb2":0.5},}
 
     lines = textwrap.dedent(lines).splitlines()
     ff = vermouth.forcefield.ForceField(name='test_ff')
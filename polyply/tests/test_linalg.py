@@ -23,7 +23,8 @@ import networkx as nx
 import polyply
 from polyply.src.linalg_functions import (_u_vect, _angle,
                                          _dih, _radius_of_gyration,
-                                         center_of_geometry, _vector_angle_degrees)
+                                         center_of_geometry, _vector_angle_degrees,
+                                         centers_of_geometry)
 
 
 def test_vector_angle_degrees():
@@ -62,6 +63,22 @@ def test_geometrical_center():
    center = center_of_geometry(coords)
    assert math.isclose(np.linalg.norm(center), 0.0)
 
+def test_geometrical_centers():
+   coords = np.array([[0.0, 0.0, 1.0],
+                      [0.0, 0.0, -1.0],
+                      [1.0, 2.0, 0.0],
+                      [3.0, 2.0, 0.0],
+                      [2.0, 5.0, 0.0],
+                      [4.0, 4.0, 4.0],
+                      [9.0, 9.0, 9.0]])
+   # the last point belongs to no group
+   offsets = np.array([0, 2, 5, 6])
+   centers = centers_of_geometry(coords, offsets)
+   expected = np.array([[0.0, 0.0, 0.0],
+                        [2.0, 3.0, 0.0],
+                        [4.0, 4.0, 4.0]])
+   assert np.allclose(centers, expected)
+
 def test_radius_of_gyration():
     coords = np.array([[0.0, 0.0, 1.0],
                        [0.0, 1.0, 0.0],
@@ -16,6 +16,7 @@ Test that force field files are properly read.
 """
 
 from collections import defaultdict
+import logging
 import textwrap
 import pytest
 import vermouth.forcefield
@@ -97,7 +98,7 @@ class TestTopParsing:
         OM      O         1    1.9670816e-03  8.5679450e-07
         """,
         "nonbond_params",
-        {frozenset(["OM", "O"]):{"f": 1,
+        {("O", "OM"):{"f": 1,
                                  "nb1": 1.9670816e-03,
                                  "nb2": 8.5679450e-07}}
         ),
@@ -106,7 +107,7 @@ class TestTopParsing:
         OM      O         1    1.9670816e-03  8.5679450e-07
         """,
         "types",
-        {"bonds": {("OM", "O"): [(["1", "1.9670816e-03", "8.5679450e-07"], None)]}}
+        {"bonds": {("O", "OM"): [(["1", "1.9670816e-03", "8.5679450e-07"], None)]}}
          ),
         ("""
         [ dihedraltypes ]
@@ -335,6 +336,23 @@ class TestTopParsing:
         with pytest.raises(IOError):
             polyply.src.top_parser.read_topology(new_lines, top)
 
+    @staticmethod
+    def test_reversed_type_warning(caplog):
+        lines = """
+        [ bondtypes ]
+        CA      CB      1       0.10    1000
+        CB      CA      1       0.20    2000
+        """
+        new_lines = textwrap.dedent(lines)
+        new_lines = new_lines.splitlines()
+        force_field = vermouth.forcefield.ForceField(name='test_ff')
+        top = Topology(force_field, name="test")
+        with caplog.at_level(logging.WARNING):
+            polyply.src.top_parser.read_topology(new_lines, top)
+        assert any("reverse orientation" in record.getMessage()
+                   for record in caplog.records)
+        assert top.types["bonds"][("CA", "CB")] == [(["1", "0.20", "2000"], None)]
+
     @staticmethod
     def test_atom_type_fail():
         lines = """
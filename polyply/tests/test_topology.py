@@ -140,13 +140,13 @@ class TestTopology:
         O       8 0.000 0.000  A   2.7106496e-03  9.9002500e-07
         C       8 0.000 0.000  A   1.7106496e-03  9.9002500e-07
         """,
-        {frozenset(["O", "O"]): {"f": 1,
+        {("O", "O"): {"f": 1,
                                "nb1": 2.7106496e-03,
                                "nb2": 9.9002500e-07},
-         frozenset(["C", "C"]): {"f": 1,
+         ("C", "C"): {"f": 1,
                                "nb1": 1.7106496e-03,
                                "nb2": 9.9002500e-07},
-         frozenset(["C", "O"]): {"f": 1,
+         ("C", "O"): {"f": 1,
                                "nb1": 0.0022106496,
                                "nb2": 9.9002500e-07}}
         ),
@@ -157,13 +157,13 @@ class TestTopology:
         C   C   6      12.01100     0.500       A    3.75000e-01  4.39320e-01 ; SIG
         O   O   8      15.99940    -0.500       A    2.96000e-01  8.78640e-01 ; SIG
         """,
-        {frozenset(["C", "C"]): {"f": 1,
+        {("C", "C"): {"f": 1,
                                "nb1": 3.75000e-01,
                                "nb2": 4.39320e-01},
-         frozenset(["O", "O"]): {"f": 1,
+         ("O", "O"): {"f": 1,
                                "nb1": 2.96000e-01,
                                "nb2": 8.78640e-01},
-         frozenset(["O", "C"]): {"f": 1,
+         ("C", "O"): {"f": 1,
                                "nb1": 0.3355,
                                "nb2": 0.6212923022217481}}
         ),
@@ -177,13 +177,13 @@ class TestTopology:
         [ nonbond_params ]
         C    O    1     2.0     4.0
         """,
-        {frozenset(["O", "O"]): {"f": 1,
+        {("O", "O"): {"f": 1,
                                "nb1": 2.7106496e-03,
                                "nb2": 9.9002500e-07},
-         frozenset(["C", "C"]): {"f": 1,
+         ("C", "C"): {"f": 1,
                                "nb1": 1.7106496e-03,
                                "nb2": 9.9002500e-07},
-         frozenset(["C", "O"]): {"f": 1,
+         ("C", "O"): {"f": 1,
                                "nb1": 2.0,
                                "nb2": 4.0}}
         )))
@@ -296,11 +296,30 @@ class TestTopology:
 
         force_field = vermouth.forcefield.ForceField(name='test_ff')
         top =  Topology(force_field, name="test")
-        top.nonbond_params = {frozenset(["EO", "EO"]):
+        top.nonbond_params = {("EO", "EO"):
                              {"nb1":6.44779031E-02 , "nb2": 4.07588234E-04}}
         top.convert_nonbond_to_sig_eps()
-        assert math.isclose(top.nonbond_params[frozenset(["EO", "EO"])]["nb1"], 0.43)
-        assert math.isclose(top.nonbond_params[frozenset(["EO", "EO"])]["nb2"], 3.4*0.75)
+        assert math.isclose(top.nonbond_params[("EO", "EO")]["nb1"], 0.43)
+        assert math.isclose(top.nonbond_params[("EO", "EO")]["nb2"], 3.4*0.75)
+
+    @staticmethod
+    @pytest.mark.parametrize('nb1, nb2', (
+        # zero C6
+        (0.0, 4.07588234E-04),
+        # zero C12
+        (6.44779031E-02, 0.0),
+        ))
+    def test_convert_nonbond_to_sig_eps_fail(nb1, nb2):
+        """
+        If only one of C6 and C12 is zero sigma and epsilon are
+        not defined and an error must be raised.
+        """
+        force_field = vermouth.forcefield.ForceField(name='test_ff')
+        top =  Topology(force_field, name="test")
+        top.nonbond_params = {("EO", "EO"): {"nb1": 0.0, "nb2": 0.0},
+                              ("EO", "PO"): {"nb1": nb1, "nb2": nb2}}
+        with pytest.raises(ZeroDivisionError, match="EO PO"):
+            top.convert_nonbond_to_sig_eps()
 
     @staticmethod
     @pytest.mark.parametrize('lines, outcome', (
@@ -324,6 +343,104 @@ class TestTopology:
         """,
         {"bonds": [Interaction(atoms=(0, 1), parameters=["1", "0.1335", "502080.0"], meta={})]}
         ),
+        # test a type redefined in reverse orientation overrides the first definition
+        (
+        """
+        [ defaults ]
+        1.0   1.0   yes  1.0     1.0
+        [ bondtypes ]
+        CA      CB      1       0.10    1000
+        CB      CA      1       0.20    2000
+        [ moleculetype ]
+        test 3
+        [ atoms ]
+        1 CA  1 test C1 1   0.0 14.0
+        2 CB  1 test C2 2   0.0 12.0
+        [ bonds ]
+        1 2  1
+        [ system ]
+        some title
+        [ molecules ]
+        test 1
+        """,
+        {"bonds": [Interaction(atoms=(0, 1), parameters=["1", "0.20", "2000"], meta={})]}
+        ),
+        # test the same with the bond in reverse orientation
+        (
+        """
+        [ defaults ]
+        1.0   1.0   yes  1.0     1.0
+        [ bondtypes ]
+        CA      CB      1       0.10    1000
+        CB      CA      1       0.20    2000
+        [ moleculetype ]
+        test 3
+        [ atoms ]
+        1 CB  1 test C1 1   0.0 14.0
+        2 CA  1 test C2 2   0.0 12.0
+        [ bonds ]
+        1 2  1
+        [ system ]
+        some title
+        [ molecules ]
+        test 1
+        """,
+        {"bonds": [Interaction(atoms=(0, 1), parameters=["1", "0.20", "2000"], meta={})]}
+        ),
+        # test a wildcard dihedral type redefined in reverse orientation
+        (
+        """
+        [ defaults ]
+        1.0   1.0   yes  1.0     1.0
+        [ dihedraltypes ]
+        X    CB   CC   X      9   180.0  1.0  2
+        X    CB   CC   X      9   0.0    0.5  3
+        X    CC   CB   X      9   180.0  2.0  2
+        [ moleculetype ]
+        test 3
+        [ atoms ]
+        1 CA  1 test C1 1   0.0 14.0
+        2 CB  1 test C2 2   0.0 12.0
+        3 CC  1 test C3 3   0.0 12.0
+        4 CD  1 test C4 4   0.0 12.0
+        [ dihedrals ]
+        1  2  3  4 9
+        [ system ]
+        some title
+        [ molecules ]
+        test 1
+        """,
+        {"dihedrals": [Interaction(atoms=(0, 1, 2, 3), parameters=["9", "180.0", "2.0", "2"],
+                                   meta={})]}
+        ),
+        # test reversed alternatives within #ifdef/#else are both kept
+        (
+        """
+        [ defaults ]
+        1.0   1.0   yes  1.0     1.0
+        [ bondtypes ]
+        #ifdef old
+        CA      CB      1       0.10    1000
+        #else
+        CB      CA      1       0.20    2000
+        #endif
+        [ moleculetype ]
+        test 3
+        [ atoms ]
+        1 CB  1 test C1 1   0.0 14.0
+        2 CA  1 test C2 2   0.0 12.0
+        [ bonds ]
+        1 2  1
+        [ system ]
+        some title
+        [ molecules ]
+        test 1
+        """,
+        {"bonds": [Interaction(atoms=(0, 1), parameters=["1", "0.10", "1000"],
+                               meta={'tag': 'old', 'condition': 'ifdef'}),
+                   Interaction(atoms=(0, 1), parameters=["1", "0.20", "2000"],
+                               meta={'tag': 'old', 'condition': 'ifndef'})]}
+        ),
         # test three element define
         (
         """